@@ -21,9 +21,12 @@ def print_step(title):
     print(title)
     print("=" * 60)
 
+# Precompiled translation table: one C-level scan instead of two replaces
+_SAFE_TABLE = str.maketrans({" ": "_", "/": "_"})
+
 def safe_name(name):
     """Convert spaces/slashes to underscores for folder paths."""
-    return name.replace(" ", "_").replace("/", "_")
+    return name.translate(_SAFE_TABLE)
 
 def list_databases(dbs, base_dir=None, folder_type="JSON"):
     """Print all databases with availability info."""
@@ -1,142 +1,212 @@
 import os
+import csv
+import re
+import shutil
 import pandas as pd
+import polars as pl  # Rust CSV reader for the summary
 from tqdm import tqdm  # For progress bars during batch processing
+from concurrent.futures import ThreadPoolExecutor  # For parallel file processing
+
+# ----------------------------
+# Parallel processing settings
+# ----------------------------
+MAX_WORKERS = 10  # Number of threads to process files concurrently
+
+# Column order of the summary CSV (and of the tuples returned by workers)
+SUMMARY_COLUMNS = ["File", "MOF_ID", "Database", "Adsorbate", "Temperature",
+                   "Surface_area_m2g", "Surface_area_m2cm3"]
+
+# Matches the value column of each "key,value" metadata line
+_HEADER_RE = re.compile(rb"^[^,\n]*,([^\n]*)", re.M)
+
+# The metadata header fits well within the first 512 bytes
+HEADER_SIZE = 512
+
+# Files up to this size keep the bytes read during classification in
+# memory and write them straight out, skipping a second disk read
+SMALL_FILE_SIZE = 128 * 1024
 
 
 # ----------------------------
-# Process a single CSV file
+# Classify a single CSV file
 # ----------------------------
-def process_csv_file(input_path, output_path):
+def classify_csv_file(input_path):
     """
-    Clean and retain a single CSV file representing an adsorption isotherm.
+    Decide from the metadata header alone whether a CSV file is retained.
 
-    Steps:
-        1. Read the first 6 lines containing metadata.
-        2. Extract MOF ID, database, surface areas, adsorbate, temperature.
-        3. Skip the file if Surface_area_m2g is 0 or NaN.
-        4. Copy the CSV to the output directory if retained.
-        5. Return a dictionary of retained MOF info for summary.
+    Reads only the first `HEADER_SIZE` bytes, extracts MOF ID, database,
+    surface areas, adsorbate and temperature, and rejects the file if
+    Surface_area_m2g is 0 or NaN. Rejected files never cost more than
+    one header-sized read. For retained files up to `SMALL_FILE_SIZE`,
+    the full content is read while the file is still open and returned
+    alongside the metadata so the copy needs no second disk read.
 
     Args:
         input_path (str): Path to the input CSV file.
-        output_path (str): Path to save the cleaned CSV file.
 
     Returns:
-        dict or None: A dictionary with MOF metadata if the file is retained, 
-                      otherwise None.
+        tuple or None: ((mof_id, database, adsorbate, temperature,
+                        sa_m2g, sa_m2cm3), raw_bytes) if the file is
+                        retained, otherwise None. `raw_bytes` is the
+                        full file content for small files, else None.
     """
-    # Read the first 6 lines (metadata)
-    with open(input_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+    with open(input_path, "rb") as f:
+        head = f.read(HEADER_SIZE)
 
-    # Skip if file is too short
-    if len(lines) < 6:
-        return None
+        # Parse the 6 metadata values with one regex pass over the header block
+        vals = _HEADER_RE.findall(head)
 
-    # Helper function to extract the second column from a CSV line
-    def get_value(line, default="N/A"):
+        # Skip if the header is incomplete
+        if len(vals) < 6:
+            return None
+
+        # Extract metadata values
+        mof_id, database, sa_m2g_s, sa_m2cm3_s, adsorbate, temperature = (
+            v.decode("utf-8", "replace").strip() for v in vals[:6]
+        )
         try:
-            return line.strip().split(",")[1]
-        except:
-            return default
-
-    # Extract metadata values
-    mof_id = get_value(lines[0], "unknown")
-    database = get_value(lines[1], "unknown")
-    try:
-        sa_m2g = float(get_value(lines[2], 0.0))
-    except:
-        sa_m2g = 0.0
-    try:
-        sa_m2cm3 = float(get_value(lines[3], 0.0))
-    except:
-        sa_m2cm3 = 0.0
-    adsorbate = get_value(lines[4], "N/A")
-    temperature = get_value(lines[5], "N/A")
-
-    # Skip file if Surface_area_m2g is zero or NaN
-    if sa_m2g == 0.0 or pd.isna(sa_m2g):
-        return None
-
-    # Ensure output folder exists and copy the CSV file
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(input_path, "r", encoding="utf-8") as src, open(output_path, "w", encoding="utf-8") as dst:
-        dst.writelines(src.readlines())
-
-    # Return a dictionary of metadata for summary
-    return {
-        "File": os.path.relpath(output_path, output_path),  # Relative file path
-        "MOF_ID": mof_id,
-        "Database": database,
-        "Adsorbate": adsorbate,
-        "Temperature": temperature,
-        "Surface_area_m2g": sa_m2g,
-        "Surface_area_m2cm3": sa_m2cm3
-    }
+            sa_m2g = float(sa_m2g_s)
+        except ValueError:
+            sa_m2g = 0.0
+        try:
+            sa_m2cm3 = float(sa_m2cm3_s)
+        except ValueError:
+            sa_m2cm3 = 0.0
+
+        # Skip file if Surface_area_m2g is zero or NaN
+        if sa_m2g == 0.0 or pd.isna(sa_m2g):
+            return None
+
+        # Retained: keep the content in memory if the file is small
+        rest = f.read(SMALL_FILE_SIZE - HEADER_SIZE + 1)
+        if len(rest) <= SMALL_FILE_SIZE - HEADER_SIZE:  # EOF reached
+            raw_bytes = head + rest
+        else:
+            raw_bytes = None  # Large file, copy it kernel-side instead
+
+    return ((mof_id, database, adsorbate, temperature, sa_m2g, sa_m2cm3),
+            raw_bytes)
+
+
+# ----------------------------
+# Copy a retained CSV file
+# ----------------------------
+def copy_retained(input_path, output_path, raw_bytes=None):
+    """
+    Copy a retained CSV to the output directory.
+
+    Writes `raw_bytes` directly when the classifier already holds the
+    full content; otherwise falls back to `shutil.copyfile`, which
+    performs an in-kernel copy (sendfile/copy_file_range) where the
+    platform supports it. The output directory must already exist
+    (`clean_isotherms` creates each one once).
+    """
+    if raw_bytes is not None:
+        with open(output_path, "wb") as dst:
+            dst.write(raw_bytes)
+    else:
+        shutil.copyfile(input_path, output_path)
+
+
+# ----------------------------
+# Recursively find CSV files
+# ----------------------------
+def iter_csv_files(directory):
+    """
+    Yield paths of all CSV files under `directory`, recursively.
+
+    Uses `os.scandir` so each directory costs one syscall instead of
+    one stat per entry as with `os.walk`.
+    """
+    for entry in os.scandir(directory):
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_csv_files(entry.path)
+        elif entry.name.endswith(".csv"):
+            yield entry.path
 
 
 # ----------------------------
 # Batch clean CSV files for multiple databases
 # ----------------------------
-def clean_isotherms(input_dir, output_dir, summary_file="MOF_ISO_summary.csv"):
+def clean_isotherms(input_dir, output_dir, summary_file="MOF_ISO_summary.csv", max_workers=MAX_WORKERS):
     """
     Batch process all CSV files under `input_dir`, keeping only those with
     Surface_area_m2g > 0, and save cleaned files to `output_dir`.
 
     Steps:
         1. Walk through all subfolders and CSV files.
-        2. Process each file using `process_csv_file`.
-        3. Collect metadata for retained files.
-        4. Save a summary CSV containing all retained MOF info.
+        2. Classify the files in parallel using `classify_csv_file`
+           (header-only read) and copy retained ones via `copy_retained`.
+        3. Stream metadata of retained files into the summary CSV.
 
     Args:
         input_dir (str): Root directory containing raw CSV files.
         output_dir (str): Directory to save cleaned CSV files.
         summary_file (str): Name of the summary CSV file.
+        max_workers (int): Number of threads processing files concurrently.
 
     Returns:
         dict: A dictionary containing:
-            - summary_df: Pandas DataFrame of retained MOFs (or None)
+            - summary_df: Polars DataFrame of retained MOFs (or None)
             - summary_path: Path to saved summary CSV (or None)
             - total_files: Total number of CSV files scanned
             - kept_files: Number of files retained
             - removed_files: Number of files skipped
     """
-    all_records = []  # List to store metadata of retained MOFs
+    # Output directories already created this run; avoids a redundant
+    # makedirs (stat+mkdir) per retained file landing in the same folder
+    created_dirs = set()
+
+    def process_one(input_path):
+        # Cheap header-only read decides retention before any full copy
+        result = classify_csv_file(input_path)
+        if result is None:
+            return None
+        meta, raw_bytes = result
+        rel_path = os.path.relpath(input_path, input_dir)
+        output_path = os.path.join(output_dir, rel_path)
+        out_folder = os.path.dirname(output_path)
+        if out_folder not in created_dirs:
+            os.makedirs(out_folder, exist_ok=True)  # exist_ok makes races benign
+            created_dirs.add(out_folder)
+        copy_retained(input_path, output_path, raw_bytes)
+        mof_id, database, adsorbate, temperature, sa_m2g, sa_m2cm3 = meta
+        # Record in SUMMARY_COLUMNS order
+        return (os.path.relpath(output_path, output_path), mof_id, database,
+                adsorbate, temperature, sa_m2g, sa_m2cm3)
+
     total_files = 0
     kept_files = 0
 
-    # Walk through all CSV files recursively
-    for root, _, files in os.walk(input_dir):
-        for file in tqdm(files, desc="Processing CSV files", unit="file"):
-            if not file.endswith(".csv"):
-                continue
-            total_files += 1
-            input_path = os.path.join(root, file)
-            rel_path = os.path.relpath(input_path, input_dir)
-            output_path = os.path.join(output_dir, rel_path)
-
-            # Process single CSV file
-            record = process_csv_file(input_path, output_path)
-            if record:
-                all_records.append(record)
-                kept_files += 1
+    summary_path = os.path.join(output_dir, summary_file)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Process files in parallel and stream retained records straight into
+    # the summary CSV (no per-record dict, no O(N) DataFrame build).
+    # Files are dispatched to workers while the directory scan continues.
+    with open(summary_path, "w", encoding="utf-8", newline="") as sf:
+        writer = csv.writer(sf)
+        writer.writerow(SUMMARY_COLUMNS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for record in tqdm(
+                executor.map(process_one, iter_csv_files(input_dir)),
+                desc="Processing CSV files",
+                unit="file"
+            ):
+                total_files += 1
+                if record:
+                    writer.writerow(record)
+                    kept_files += 1
 
     removed_files = total_files - kept_files
 
-    # Save summary DataFrame
-    summary_path = None
+    # Load the summary back only if something was retained
     summary_df = None
-    if all_records:
-        summary_df = pd.DataFrame(all_records)
-        # Specify column order for consistency
-        cols_order = ["File", "MOF_ID", "Database", "Adsorbate", "Temperature",
-                      "Surface_area_m2g", "Surface_area_m2cm3"]
-        summary_df = summary_df[cols_order]
-
-        summary_path = os.path.join(output_dir, summary_file)
-        os.makedirs(os.path.dirname(summary_path), exist_ok=True)
-        summary_df.to_csv(summary_path, index=False)
+    if kept_files:
+        summary_df = pl.read_csv(summary_path)
+    else:
+        os.remove(summary_path)
+        summary_path = None
 
     # Return statistics
     return {
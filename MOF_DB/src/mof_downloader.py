@@ -1,7 +1,10 @@
 import os
-import json
+import math
+import orjson  # C JSON 编码器，序列化比标准库快数倍
+from functools import lru_cache  # 缓存数据库列表，避免重复请求
 import requests
 import time
+from requests.adapters import HTTPAdapter  # 连接池配置
 from tqdm import tqdm  # 进度条显示
 from concurrent.futures import ThreadPoolExecutor  # 并行保存 MOF 文件
 
@@ -15,23 +18,34 @@ DATABASES_URL = f"{BASE_URL}/databases.json"  # 获取数据库列表的 API
 PER_PAGE = 200  # 每页 MOF 数量
 MAX_RETRIES = 3  # 请求失败最大重试次数
 MAX_WORKERS = 10  # 并行保存文件线程数
+PAGE_WORKERS = 16  # 并行下载分页线程数
+
+# 共享连接池：复用 TCP/TLS 连接，避免每页重新握手
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=PAGE_WORKERS,
+                                       pool_maxsize=PAGE_WORKERS))
 
 # ----------------------------
 # 工具函数：安全文件夹名
 # ----------------------------
+# 预编译转换表：空格和斜杠替换为下划线，单次扫描完成
+_SAFE_TABLE = str.maketrans({" ": "_", "/": "_"})
+
 def safe_name(name: str) -> str:
     """
     将数据库名称或 MOF ID 转为安全文件夹/文件名
     替换空格和斜杠
     """
-    return name.replace(" ", "_").replace("/", "_")
+    return name.translate(_SAFE_TABLE)
 
 # ----------------------------
 # 获取可用数据库列表
 # ----------------------------
+@lru_cache(maxsize=1)
 def fetch_databases():
     """
     从服务器获取可用 MOF 数据库列表
+    结果在进程内缓存，同一次运行只请求一次
 
     Returns:
         list: 每个数据库是一个 dict，包含:
@@ -39,9 +53,9 @@ def fetch_databases():
               - "count" (int): MOF 数量
     """
     try:
-        resp = requests.get(DATABASES_URL)
+        resp = _session.get(DATABASES_URL)
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
         databases = []
         for db in data:
             databases.append({"name": db["name"], "count": db.get("mofs", 0)})
@@ -62,9 +76,47 @@ def fetch_databases():
 # ----------------------------
 # 获取指定数据库的所有 MOF
 # ----------------------------
+def fetch_page(database, page):
+    """
+    带重试地获取单页响应 JSON，失败返回 None
+
+    Args:
+        database (str): 数据库名称
+        page (int): 页码
+
+    Returns:
+        dict or list or None: 响应 JSON，全部重试失败时为 None
+    """
+    url = f"{MOFS_URL}?database={database}&page={page}&per_page={PER_PAGE}"
+    for attempt in range(1, MAX_RETRIES + 1):  # 重试机制
+        try:
+            resp = _session.get(url, timeout=10)
+            resp.raise_for_status()
+            return orjson.loads(resp.content)
+        except Exception as e:
+            print(f"⚠️ Page {page} request failed, retry {attempt}/{MAX_RETRIES}: {e}")
+            time.sleep(1)
+    print(f"❌ Page {page} failed after {MAX_RETRIES} retries, skipping")
+    return None
+
+
+def extract_mofs(data, page):
+    """从单页响应 JSON 中取出 MOF 列表，找不到返回 None"""
+    if isinstance(data, dict):
+        for k in ["mofs", "results", "data"]:
+            if k in data and isinstance(data[k], list):
+                return data[k]
+        return None
+    if isinstance(data, list):
+        return data
+    print(f"❌ Unknown data structure on page {page}: {type(data)}")
+    return None
+
+
 def get_all_mofs(database):
     """
     使用分页获取某个数据库的所有 MOF
+    首页拿到总数后，其余分页并行下载
 
     Args:
         database (str): 数据库名称
@@ -73,48 +125,51 @@ def get_all_mofs(database):
         list: MOF 记录列表，每条是 dict
     """
     all_mofs = []
-    page = 1
     print(f"\nFetching MOFs from database '{database}' ...")
 
-    while True:
-        url = f"{MOFS_URL}?database={database}&page={page}&per_page={PER_PAGE}"
-        for attempt in range(1, MAX_RETRIES + 1):  # 重试机制
-            try:
-                resp = requests.get(url, timeout=10)
-                resp.raise_for_status()
-                break
-            except Exception as e:
-                print(f"⚠️ Page {page} request failed, retry {attempt}/{MAX_RETRIES}: {e}")
-                time.sleep(1)
-                if attempt == MAX_RETRIES:
-                    print(f"❌ Page {page} failed after {MAX_RETRIES} retries, skipping")
-                    return all_mofs
-
-        data = resp.json()
-        mofs = None
-        # 判断响应中 MOF 列表位置
-        if isinstance(data, dict):
-            for k in ["mofs", "results", "data"]:
-                if k in data and isinstance(data[k], list):
-                    mofs = data[k]
-                    break
-        elif isinstance(data, list):
-            mofs = data
-        else:
-            print(f"❌ Unknown data structure on page {page}: {type(data)}")
-            break
+    # 先取第一页，确定总页数
+    data = fetch_page(database, 1)
+    if data is None:
+        return all_mofs
+    mofs = extract_mofs(data, 1)
+    if not mofs:
+        print("⚠️ No MOF data found on page 1")
+        return all_mofs
+    all_mofs.extend(mofs)
+    print(f"✅ Page 1: {len(mofs)} records (total {len(all_mofs)})")
 
-        if not mofs:
-            print(f"⚠️ No MOF data found on page {page}")
-            break
+    # 响应中报告的 MOF 总数（键名因 API 版本而异）
+    total = None
+    if isinstance(data, dict):
+        total = data.get("total") or data.get("count")
 
-        all_mofs.extend(mofs)
-        print(f"✅ Page {page}: {len(mofs)} records (total {len(all_mofs)})")
-
-        if len(mofs) < PER_PAGE:  # 最后一页
-            break
-        page += 1
-        time.sleep(0.01)
+    if isinstance(total, int) and total > 0:
+        # 已知总页数：并行抓取剩余分页
+        n_pages = math.ceil(total / PER_PAGE)
+        if n_pages > 1:
+            pages = range(2, n_pages + 1)
+            with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+                for page, page_data in zip(pages, executor.map(lambda p: fetch_page(database, p), pages)):
+                    mofs = extract_mofs(page_data, page) if page_data is not None else None
+                    if not mofs:
+                        print(f"⚠️ No MOF data found on page {page}")
+                        continue
+                    all_mofs.extend(mofs)
+                    print(f"✅ Page {page}: {len(mofs)} records (total {len(all_mofs)})")
+    else:
+        # 未知总数：退回串行分页（连接仍复用）
+        page = 2
+        while len(mofs) == PER_PAGE:
+            data = fetch_page(database, page)
+            if data is None:
+                break
+            mofs = extract_mofs(data, page)
+            if not mofs:
+                print(f"⚠️ No MOF data found on page {page}")
+                break
+            all_mofs.extend(mofs)
+            print(f"✅ Page {page}: {len(mofs)} records (total {len(all_mofs)})")
+            page += 1
 
     print(f"📦 Total {len(all_mofs)} MOF records fetched")
     return all_mofs
@@ -125,6 +180,7 @@ def get_all_mofs(database):
 def save_one_mof(mof, database, save_dir):
     """
     将单个 MOF 保存为 JSON 和 CIF 文件
+    输出目录需已存在（由 save_mofs_parallel 统一创建）
 
     Args:
         mof (dict): MOF 数据
@@ -134,28 +190,33 @@ def save_one_mof(mof, database, save_dir):
     folder_name = safe_name(database)
     json_folder = os.path.join(save_dir, "JSON", folder_name)
     cif_folder = os.path.join(save_dir, "CIF", folder_name)
-    os.makedirs(json_folder, exist_ok=True)
-    os.makedirs(cif_folder, exist_ok=True)
 
     # MOF 文件名安全化
     mofid = str(mof.get("mofid") or mof.get("mofkey") or mof.get("id") or mof.get("name") or "mof")
     mofid = safe_name(mofid)
 
-    # 保存 JSON
+    # 保存 JSON（orjson 编码为 UTF-8 bytes，单次 write 写出）
     json_path = os.path.join(json_folder, f"{folder_name}_{mofid}.json")
     try:
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(mof, f, indent=2, ensure_ascii=False)
+        data = orjson.dumps(mof, option=orjson.OPT_INDENT_2)
+        fd = os.open(json_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
     except Exception as e:
         print(f"❌ Failed to save JSON for {mofid}: {e}")
 
-    # 保存 CIF
+    # 保存 CIF（同样单次 write 写出）
     cif_data = mof.get("cif")
     if cif_data:
         cif_path = os.path.join(cif_folder, f"{folder_name}_{mofid}.cif")
         try:
-            with open(cif_path, "w", encoding="utf-8") as f:
-                f.write(cif_data)
+            fd = os.open(cif_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, cif_data.encode("utf-8"))
+            finally:
+                os.close(fd)
         except Exception as e:
             print(f"❌ Failed to save CIF for {mofid}: {e}")
 
@@ -174,6 +235,11 @@ def save_mofs_parallel(mofs, database, save_dir):
     total = len(mofs)
     print(f"\nSaving MOFs for {database} ...")
 
+    # 输出目录只创建一次，避免每个 MOF 重复 makedirs
+    folder_name = safe_name(database)
+    os.makedirs(os.path.join(save_dir, "JSON", folder_name), exist_ok=True)
+    os.makedirs(os.path.join(save_dir, "CIF", folder_name), exist_ok=True)
+
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         list(tqdm(
             executor.map(lambda m: save_one_mof(m, database, save_dir), mofs),
@@ -182,7 +248,6 @@ def save_mofs_parallel(mofs, database, save_dir):
             desc=f"Saving {database}"
         ))
 
-    folder_name = safe_name(database)
     json_folder = os.path.join(save_dir, "JSON", folder_name)
     cif_folder = os.path.join(save_dir, "CIF", folder_name)
     json_count = len(os.listdir(json_folder)) if os.path.exists(json_folder) else 0
@@ -1,16 +1,24 @@
 import os
-import json
+import mmap
+import orjson  # C JSON parser, ~3-5x faster than stdlib json
+import polars as pl  # Rust CSV writer for the isotherm data section
+from functools import partial
 from tqdm import tqdm  # For progress bars during processing
-from concurrent.futures import ThreadPoolExecutor  # For parallel processing
+from concurrent.futures import ProcessPoolExecutor  # For parallel processing
 
 # ----------------------------
 # Parallel processing settings
 # ----------------------------
-MAX_WORKERS = 10  # Number of threads to process files concurrently
+MAX_WORKERS = os.cpu_count() or 4  # Number of worker processes
+CHUNKSIZE = 32  # Files per IPC batch, amortizes pickling overhead
+
+# 预编译转换表，单次扫描完成替换
+_SAFE_TABLE = str.maketrans({" ": "_"})  # 数据库名只替换空格
+_MOFID_TABLE = str.maketrans({" ": "_", "/": "_"})  # MOF ID 还要替换斜杠
 
 def safe_name(name: str) -> str:
     """将数据库名或文件名中的空格替换为下划线"""
-    return name.replace(" ", "_")
+    return name.translate(_SAFE_TABLE)
 
 # ----------------------------
 # Extract isotherms from a single MOF JSON file
@@ -21,9 +29,11 @@ def extract_isotherms_from_file(json_file, database, output_dir):
     """
     count = 0
     try:
-        with open(json_file, "r", encoding="utf-8") as f:
-            mof_data = json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
+        # mmap the file so orjson parses the bytes in place (no read copy)
+        with open(json_file, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                mof_data = orjson.loads(memoryview(mm))
+    except (orjson.JSONDecodeError, FileNotFoundError, ValueError) as e:
         print(f"❌ Error reading {json_file}: {e}")
         return 0
 
@@ -34,7 +44,7 @@ def extract_isotherms_from_file(json_file, database, output_dir):
         or mof_data.get("id")
         or mof_data.get("name")
         or "unknown_mof"
-    ).replace("/", "_").replace(" ", "_")  # MOF ID 文件名中仍替换空格和斜杠
+    ).translate(_MOFID_TABLE)  # MOF ID 文件名中仍替换空格和斜杠
 
     # Extract surface areas
     sa_m2g = mof_data.get("surface_area_m2g", 0.0)
@@ -50,7 +60,7 @@ def extract_isotherms_from_file(json_file, database, output_dir):
     # ----------------------------
     # Create output folder for this database
     # ----------------------------
-    folder = os.path.join(output_dir, database.replace(" ", "_"))  # 保留数据库文件夹原名
+    folder = os.path.join(output_dir, safe_name(database))  # 保留数据库文件夹原名
     os.makedirs(folder, exist_ok=True)
 
     # Loop over all isotherms
@@ -63,7 +73,7 @@ def extract_isotherms_from_file(json_file, database, output_dir):
             # ----------------------------
             # Determine CSV filename
             # ----------------------------
-            filename = f"{database.replace(' ', '_')}_{mofid}_{iso_id}.csv"  # 保留数据库文件夹原名
+            filename = f"{safe_name(database)}_{mofid}_{iso_id}.csv"  # 保留数据库文件夹原名
             filepath = os.path.join(folder, filename)
 
             # Extract metadata
@@ -75,12 +85,21 @@ def extract_isotherms_from_file(json_file, database, output_dir):
             adsorbates_list = iso.get("adsorbates", [])
             adsorbate = ";".join([a.get("name", "N/A") for a in adsorbates_list]) if adsorbates_list else "N/A"
 
-            # Extract data points and sort by pressure
+            # Extract valid data points as two columns
             data_points = iso.get("isotherm_data", [])
-            data_points_sorted = sorted(
-                [p for p in data_points if p.get("pressure") is not None and p.get("total_adsorption") is not None],
-                key=lambda x: x["pressure"]
-            )
+            pressures = []
+            adsorptions = []
+            for p in data_points:
+                if p.get("pressure") is not None and p.get("total_adsorption") is not None:
+                    pressures.append(p["pressure"])
+                    adsorptions.append(p["total_adsorption"])
+
+            # Sort and serialize the data section in one vectorized pass.
+            # strict=False coerces mixed int/float JSON values to Float64;
+            # maintain_order keeps the stable tie ordering of sorted()
+            data_df = pl.DataFrame({"pressure": pressures, "adsorption": adsorptions},
+                                   strict=False)
+            data_csv = data_df.sort("pressure", maintain_order=True).write_csv(include_header=False)
 
             # Write CSV file
             with open(filepath, "w", encoding="utf-8") as f:
@@ -94,12 +113,8 @@ def extract_isotherms_from_file(json_file, database, output_dir):
                 f.write("\n")  # 空行隔开元信息和数据
                 # 写入数据表头
                 f.write(f"Pressure ({pressure_unit}),Adsorption ({adsorption_unit})\n")
-                for point in data_points_sorted:
-                    # 写入数据点
-                    pressure = point.get("pressure")
-                    adsorption = point.get("total_adsorption")
-                    if pressure is not None and adsorption is not None:
-                        f.write(f"{pressure},{adsorption}\n")
+                # 写入数据点
+                f.write(data_csv)
             count += 1
         except Exception as e:
             print(f"❌ Error processing isotherm {iso.get('id', idx)} in {json_file}: {e}")
@@ -128,10 +143,12 @@ def process_database(database, json_dir, output_dir, max_workers=MAX_WORKERS):
 
     print(f"\nProcessing database '{database}', total {len(json_files)} JSON files...")
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    # Decoding + formatting is CPU-bound Python, so use processes, not threads
+    worker = partial(extract_isotherms_from_file, database=database, output_dir=output_dir)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
         results = list(
             tqdm(
-                executor.map(lambda f: extract_isotherms_from_file(f, database, output_dir), json_files),
+                executor.map(worker, json_files, chunksize=CHUNKSIZE),
                 total=len(json_files),
                 unit="files",
                 desc=f"Extracting from {database}"